@@ -0,0 +1,27 @@
+"""add route preferences coordinates index
+
+Revision ID: b7e4c1d9a2f3
+Revises: 8f2fc156b3bb
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c1d9a2f3'
+down_revision: Union[str, Sequence[str], None] = '8f2fc156b3bb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_route_preferences_user_coords', 'route_preferences', ['user_id', 'from_latitude', 'from_longitude', 'to_latitude', 'to_longitude'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_route_preferences_user_coords', table_name='route_preferences')
@@ -0,0 +1,50 @@
+"""store route preference coordinates as e7 integers
+
+Revision ID: c3a8f5e1b6d4
+Revises: b7e4c1d9a2f3
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8f5e1b6d4'
+down_revision: Union[str, Sequence[str], None] = 'b7e4c1d9a2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_E7_COLUMNS = {
+    'from_lat_e7': 'from_latitude',
+    'from_lon_e7': 'from_longitude',
+    'to_lat_e7': 'to_latitude',
+    'to_lon_e7': 'to_longitude',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in _E7_COLUMNS:
+        op.add_column('route_preferences', sa.Column(column, sa.Integer(), nullable=True))
+    op.execute(
+        'UPDATE route_preferences SET '
+        + ', '.join(
+            f'{column} = ROUND({source} * 10000000)'
+            for column, source in _E7_COLUMNS.items()
+        )
+    )
+    for column in _E7_COLUMNS:
+        op.alter_column('route_preferences', column, nullable=False)
+    op.drop_index('ix_route_preferences_user_coords', table_name='route_preferences')
+    op.create_index('ix_route_preferences_user_coords', 'route_preferences', ['user_id', 'from_lat_e7', 'from_lon_e7', 'to_lat_e7', 'to_lon_e7'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_route_preferences_user_coords', table_name='route_preferences')
+    op.create_index('ix_route_preferences_user_coords', 'route_preferences', ['user_id', 'from_latitude', 'from_longitude', 'to_latitude', 'to_longitude'], unique=False)
+    for column in _E7_COLUMNS:
+        op.drop_column('route_preferences', column)
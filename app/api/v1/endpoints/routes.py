@@ -8,7 +8,7 @@ import logging
 from datetime import datetime, timezone
 from typing import List, cast
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
@@ -51,7 +51,8 @@ async def search_routes(
         current_user: Authenticated user (required)
 
     Returns:
-        RouteSearchResponse with list of available route itineraries
+        RouteSearchResponse (serialized as JSON) with list of available
+        route itineraries
 
     Raises:
         HTTPException: If the route search fails or returns invalid data
@@ -142,13 +143,20 @@ async def search_routes(
             "Route search successful: found %d itineraries", len(itineraries)
         )
 
-        return RouteSearchResponse(
+        response = RouteSearchResponse(
             origin=request.origin,
             destination=request.destination,
             itineraries=final_itineraries,
             search_time=datetime.now(timezone.utc),
         )
 
+        # The response model is already validated; returning a Response
+        # directly skips FastAPI re-validating the whole itinerary tree.
+        return Response(
+            content=response.model_dump_json(),
+            media_type="application/json",
+        )
+
     except RoutingAPIError as e:
         logger.error("HSL API error: %s", str(e))
         raise HTTPException(
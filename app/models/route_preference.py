@@ -1,12 +1,49 @@
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 
 from app.db.database import Base
 
+# Coordinates are also stored as integer degrees * 1e7 (about 1 cm), so
+# lookups compare exact integers instead of floats
+COORDINATE_SCALE = 10_000_000
+
+
+def to_e7(degrees: float) -> int:
+    """Convert degrees to the integer form used for coordinate lookups."""
+    return round(degrees * COORDINATE_SCALE)
+
+
+# Integer lookup column kept in sync with each float coordinate column
+_E7_COLUMNS = {
+    "from_latitude": "from_lat_e7",
+    "from_longitude": "from_lon_e7",
+    "to_latitude": "to_lat_e7",
+    "to_longitude": "to_lon_e7",
+}
+
 
 class RoutePreference(Base):
     __tablename__ = "route_preferences"
+    # Serves get_preferences_by_coordinates as a single index seek
+    __table_args__ = (
+        Index(
+            "ix_route_preferences_user_coords",
+            "user_id",
+            "from_lat_e7",
+            "from_lon_e7",
+            "to_lat_e7",
+            "to_lon_e7",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
@@ -17,6 +54,10 @@ class RoutePreference(Base):
     from_longitude = Column(Float, nullable=False)
     to_latitude = Column(Float, nullable=False)
     to_longitude = Column(Float, nullable=False)
+    from_lat_e7 = Column(Integer, nullable=False)
+    from_lon_e7 = Column(Integer, nullable=False)
+    to_lat_e7 = Column(Integer, nullable=False)
+    to_lon_e7 = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -37,3 +78,9 @@ class RoutePreference(Base):
         self.from_longitude = from_longitude
         self.to_latitude = to_latitude
         self.to_longitude = to_longitude
+
+    @validates(*_E7_COLUMNS)
+    def _sync_e7(self, key, value):
+        """Update the integer lookup column whenever a coordinate is set."""
+        setattr(self, _E7_COLUMNS[key], to_e7(value))
+        return value
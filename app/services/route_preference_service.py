@@ -7,7 +7,7 @@ from typing import List, Optional
 from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.models.route_preference import RoutePreference
+from app.models.route_preference import RoutePreference, to_e7
 from app.schemas.route_preference import RoutePreferenceCreate
 
 
@@ -45,6 +45,7 @@ class RoutePreferenceService:
     ) -> List[RoutePreference]:
         """
         Get route preferences for a user that match specific coordinates.
+        Coordinates are compared at 1e-7 degree precision.
 
         Args:
             db: Database session
@@ -61,10 +62,10 @@ class RoutePreferenceService:
             db.query(RoutePreference)
             .filter(
                 RoutePreference.user_id == user_id,
-                RoutePreference.from_latitude == from_latitude,
-                RoutePreference.from_longitude == from_longitude,
-                RoutePreference.to_latitude == to_latitude,
-                RoutePreference.to_longitude == to_longitude,
+                RoutePreference.from_lat_e7 == to_e7(from_latitude),
+                RoutePreference.from_lon_e7 == to_e7(from_longitude),
+                RoutePreference.to_lat_e7 == to_e7(to_latitude),
+                RoutePreference.to_lon_e7 == to_e7(to_longitude),
             )
             .all()
         )
@@ -97,6 +97,9 @@ query GetItinerary(
 }
 """
 
+# Parsed once at import; the document is immutable and reused by every call
+ITINERARY_DOCUMENT = gql(ITINERARY_QUERY)
+
 
 class RoutingServiceError(Exception):
     """Base exception for routing service errors."""
@@ -186,10 +189,9 @@ class RoutingService:
 
         try:
             client = self._get_client()
-            query = gql(ITINERARY_QUERY)
 
             result = await client.execute_async(
-                query, variable_values=variables
+                ITINERARY_DOCUMENT, variable_values=variables
             )
 
             return self._parse_itinaries(result)
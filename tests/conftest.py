@@ -1,18 +1,23 @@
+import importlib
 import os
 import sys
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from httpx import ASGITransport, AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.db.database import Base, get_db
 from app.main import app
+from app.services.auth_service import auth_service
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Test database URL - using SQLite for tests is simpler
+# Test database URL - using SQLite for tests is simpler. The database lives
+# in memory of the current process, so each pytest-xdist worker gets its own.
 SQLALCHEMY_DATABASE_TEST_URL = "sqlite:///:memory:"
 
 test_engine = create_engine(
@@ -21,27 +26,94 @@ test_engine = create_engine(
     poolclass=StaticPool,
 )
 
+
+# pysqlite does not emit BEGIN on its own and so breaks SAVEPOINT support;
+# let SQLAlchemy manage transactions explicitly instead.
+@event.listens_for(test_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
 TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=test_engine
 )
 
 
-@pytest.fixture(scope="function")
-def db():
-    # Create all tables
+def pytest_collection_modifyitems(items):
+    """Marks each test db or unit by whether it uses the test database."""
+    for item in items:
+        if "db" in item.fixturenames:
+            item.add_marker(pytest.mark.db)
+        else:
+            item.add_marker(pytest.mark.unit)
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """Creates the test database schema once per test session."""
     Base.metadata.create_all(bind=test_engine)
+    yield test_engine
+    Base.metadata.drop_all(bind=test_engine)
 
-    db = TestingSessionLocal()
+
+@pytest.fixture(scope="function")
+def db(db_engine):
+    """
+    Provides a session wrapped in a transaction that is rolled back after
+    the test. Commits inside the test only release a SAVEPOINT.
+    """
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    db = TestingSessionLocal(
+        bind=connection, join_transaction_mode="create_savepoint"
+    )
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=test_engine)
+        transaction.rollback()
+        connection.close()
 
 
-@pytest.fixture(scope="function")
-def client(db):
-    """Provides a FastAPI test client with test database."""
+@pytest.fixture(scope="session", autouse=True)
+def _fast_password_hashing():
+    """
+    Hashes passwords with the minimum bcrypt cost during tests. Password
+    strength is not under test, so the production work factor is wasted time.
+    """
+    # app.services re-exports the auth_service instance under the module's name
+    auth_service_module = importlib.import_module("app.services.auth_service")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            auth_service_module,
+            "pwd_context",
+            CryptContext(
+                schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4
+            ),
+        )
+        yield
+
+
+@pytest.fixture(scope="session")
+def hashed_test_password():
+    """Hashes the shared test user password once per test session."""
+    return auth_service.get_password_hash("testpassword")
+
+
+@pytest.fixture(scope="session")
+def _test_client():
+    """Provides a FastAPI test client shared by the whole test session."""
+    with TestClient(app) as c:
+        yield c
+
+
+def _override_get_db(db):
+    """Point the app's get_db dependency at the test session."""
 
     def override_get_db():
         try:
@@ -51,7 +123,29 @@ def client(db):
 
     app.dependency_overrides[get_db] = override_get_db
 
-    with TestClient(app) as c:
+
+@pytest.fixture(scope="function")
+def client(db, _test_client):
+    """Provides a FastAPI test client with test database."""
+    _override_get_db(db)
+
+    yield _test_client
+
+    # Clean up overrides after test
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+async def async_client(db):
+    """
+    Provides an async HTTP client that calls the app in-process through
+    ASGI, without TestClient's sync-to-async portal, with test database.
+    """
+    _override_get_db(db)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
         yield c
 
     # Clean up overrides after test
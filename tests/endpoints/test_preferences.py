@@ -13,8 +13,7 @@ def create_test_user(db: Session, username: str = "testuser") -> User:
         hashed_password=auth_service.get_password_hash("testpassword"),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
 
@@ -30,8 +29,7 @@ def create_test_preference(
     """Helper function to create a test global preference"""
     preference = GlobalPreference(user_id=user_id, prompt=prompt)
     db.add(preference)
-    db.commit()
-    db.refresh(preference)
+    db.flush()
     return preference
 
 
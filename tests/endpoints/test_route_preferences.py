@@ -13,8 +13,7 @@ def create_test_user(db: Session, username: str = "testuser") -> User:
         hashed_password=auth_service.get_password_hash("testpassword"),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
 
@@ -43,8 +42,7 @@ def create_test_route_preference(
         to_longitude=to_lon,
     )
     db.add(preference)
-    db.commit()
-    db.refresh(preference)
+    db.flush()
     return preference
 
 
@@ -2,798 +2,412 @@
 Unit tests for routes endpoint with user preferences integration.
 """
 
-from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
 
 import pytest
-from fastapi.testclient import TestClient
+from httpx import AsyncClient
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 
-from app.models.global_preference import GlobalPreference
-from app.models.route_preference import RoutePreference
 from app.models.user import User
 from app.schemas.geo import Coordinates
+from app.schemas.insight import ItineraryWithInsight, LegWithInsight
 from app.schemas.itinary import Itinerary, Leg, Route, TransportMode
 from app.schemas.location import Place
 from app.services.auth_service import auth_service
 
-
-def create_test_user(db: Session, username: str = "testuser") -> User:
+_T0 = datetime(2025, 10, 14, 10, 0, 0, tzinfo=timezone.utc)
+_T10 = _T0 + timedelta(minutes=10)
+_T45 = _T0 + timedelta(minutes=45)
+
+_ORIGIN = Place.model_construct(
+    coordinates=Coordinates.model_construct(
+        latitude=60.1699, longitude=24.9384
+    ),
+    name="Origin",
+)
+_BUS_STOP = Place.model_construct(
+    coordinates=Coordinates.model_construct(
+        latitude=60.1710, longitude=24.9400
+    ),
+    name="Bus Stop",
+)
+_DESTINATION = Place.model_construct(
+    coordinates=Coordinates.model_construct(
+        latitude=60.2055, longitude=24.6559
+    ),
+    name="Destination",
+)
+
+_BASE_BODY = {
+    "origin": {"latitude": 60.1699, "longitude": 24.9384},
+    "destination": {"latitude": 60.2055, "longitude": 24.6559},
+}
+
+
+def create_test_user(
+    db: Session, hashed_password: str, username: str = "testuser"
+) -> User:
     """Helper function to create a test user"""
-    user = User(
-        username=username,
-        hashed_password=auth_service.get_password_hash("testpassword"),
-    )
+    user = User(username=username, hashed_password=hashed_password)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # Flushing is enough to assign user.id; no refresh SELECT needed
+    db.flush()
     return user
 
 
+@lru_cache(maxsize=None)
+def _token_for(user_id: int) -> str:
+    """Generate (and cache) an access token for the given user id"""
+    return auth_service.generate_access_token(user_id)
+
+
 def get_auth_header(user_id: int) -> dict:
     """Helper function to generate authorization header with token"""
-    token = auth_service.generate_access_token(user_id)
-    return {"Authorization": f"Bearer {token}"}
+    return {"Authorization": f"Bearer {_token_for(user_id)}"}
+
+
+@contextmanager
+def patch_routes(*names: str):
+    """Patch the given services of the routes endpoint module in one go"""
+    with ExitStack() as stack:
+        yield {
+            name: stack.enter_context(
+                patch(f"app.api.v1.endpoints.routes.{name}")
+            )
+            for name in names
+        }
+
+
+@pytest.fixture(scope="module")
+def test_user(db_engine, hashed_test_password):
+    """Create a committed test user shared by all tests in the module."""
+    with Session(db_engine, expire_on_commit=False) as session:
+        user = create_test_user(session, hashed_test_password)
+        session.commit()
+    yield user
+    with Session(db_engine) as session:
+        session.execute(delete(User).where(User.id == user.id))
+        session.commit()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_itineraries():
     """Create sample itineraries for testing."""
-    return [
-        Itinerary(
-            start=datetime(2025, 10, 14, 10, 0, 0, tzinfo=timezone.utc),
-            end=datetime(2025, 10, 14, 10, 45, 0, tzinfo=timezone.utc),
+    # The sample data is literal and known-valid, so the models are built
+    # with model_construct to skip Pydantic validation. The fixture is shared
+    # by the whole module, so it is a tuple to keep tests from mutating it.
+    return (
+        Itinerary.model_construct(
+            start=_T0,
+            end=_T45,
             duration=2700,
             walk_distance=500.0,
             walk_time=400,
             legs=[
-                Leg(
+                Leg.model_construct(
                     mode=TransportMode.WALK,
-                    start=datetime(2025, 10, 14, 10, 0, 0, tzinfo=timezone.utc),
-                    end=datetime(2025, 10, 14, 10, 10, 0, tzinfo=timezone.utc),
+                    start=_T0,
+                    end=_T10,
                     duration=600,
                     distance=500.0,
-                    from_place=Place(
-                        coordinates=Coordinates(
-                            latitude=60.1699, longitude=24.9384
-                        ),
-                        name="Origin",
-                    ),
-                    to_place=Place(
-                        coordinates=Coordinates(
-                            latitude=60.1710, longitude=24.9400
-                        ),
-                        name="Bus Stop",
-                    ),
+                    from_place=_ORIGIN,
+                    to_place=_BUS_STOP,
                     route=None,
                 ),
-                Leg(
+                Leg.model_construct(
                     mode=TransportMode.BUS,
-                    start=datetime(
-                        2025, 10, 14, 10, 10, 0, tzinfo=timezone.utc
-                    ),
-                    end=datetime(2025, 10, 14, 10, 45, 0, tzinfo=timezone.utc),
+                    start=_T10,
+                    end=_T45,
                     duration=2100,
                     distance=15000.0,
-                    from_place=Place(
-                        coordinates=Coordinates(
-                            latitude=60.1710, longitude=24.9400
-                        ),
-                        name="Bus Stop",
-                    ),
-                    to_place=Place(
-                        coordinates=Coordinates(
-                            latitude=60.2055, longitude=24.6559
-                        ),
-                        name="Destination",
-                    ),
-                    route=Route(
+                    from_place=_BUS_STOP,
+                    to_place=_DESTINATION,
+                    route=Route.model_construct(
                         short_name="550",
                         long_name="Helsinki - Espoo",
                         description="Express bus service",
                     ),
                 ),
             ],
-        )
-    ]
-
+        ),
+    )
 
-def test_search_routes_with_request_preferences(
-    db: Session, client: TestClient, sample_itineraries
-):
-    """Test route search with preferences provided in request."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            mock_routing_service.get_itinaries = AsyncMock(
-                return_value=sample_itineraries
-            )
 
-            # Create itineraries with insights
-            from app.schemas.insight import ItineraryWithInsight, LegWithInsight
-
-            itineraries_with_insights = []
-            for itinerary in sample_itineraries:
-                legs_with_insights = []
-                for leg in itinerary.legs:
-                    leg_with_insight = LegWithInsight(
-                        **leg.model_dump(), ai_insight="Optimized leg insight"
-                    )
-                    legs_with_insights.append(leg_with_insight)
-
-                itinerary_data = itinerary.model_dump()
-                itinerary_data.pop(
-                    "legs"
-                )  # Remove legs from dump since we're providing our own
-                itinerary_with_insights = ItineraryWithInsight(
-                    **itinerary_data,
-                    ai_insight="Route optimized based on preferences",
-                    legs=legs_with_insights,
-                )
-                itineraries_with_insights.append(itinerary_with_insights)
-
-            mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                return_value=itineraries_with_insights
+@pytest.fixture(scope="module")
+def sample_itineraries_with_insights(sample_itineraries):
+    """Create the sample itineraries with AI insights attached."""
+    itineraries_with_insights = []
+    for itinerary in sample_itineraries:
+        legs_with_insights = [
+            LegWithInsight.model_construct(
+                **leg.__dict__, ai_insight="Optimized leg insight"
             )
-
-            response = client.post(
-                "/api/v1/routes/search",
-                json={
-                    "origin": {"latitude": 60.1699, "longitude": 24.9384},
-                    "destination": {"latitude": 60.2055, "longitude": 24.6559},
-                    "preferences": ["prefer walking", "avoid crowded buses"],
-                },
-                headers=headers,
+            for leg in itinerary.legs
+        ]
+        itinerary_data = {
+            key: value
+            for key, value in itinerary.__dict__.items()
+            if key != "legs"
+        }
+        itineraries_with_insights.append(
+            ItineraryWithInsight.model_construct(
+                **itinerary_data,
+                ai_insight="Route optimized based on preferences",
+                legs=legs_with_insights,
             )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data["itineraries"]) == 1
-
-            # Verify AI service was called with preferences
-            mock_ai_service.get_itineraries_with_insights.assert_called_once()
-            call_args = mock_ai_service.get_itineraries_with_insights.call_args
-            assert call_args.args[0] == sample_itineraries
-            assert call_args.args[1] == [
-                {"prompt": "prefer walking"},
-                {"prompt": "avoid crowded buses"},
-            ]
-
-
-def test_search_routes_with_authenticated_user_preferences(
-    db: Session, client: TestClient, sample_itineraries
-):
-    """Test route search with authenticated user and stored preferences."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            with patch(
-                "app.api.v1.endpoints.routes.global_preference_service"
-            ) as mock_pref_service:
-                mock_routing_service.get_itinaries = AsyncMock(
-                    return_value=sample_itineraries
-                )
-
-                # Mock stored preferences for the user
-                stored_prefs = [
-                    GlobalPreference(
-                        user_id=1, prompt="I prefer eco-friendly routes"
-                    ),
-                    GlobalPreference(user_id=1, prompt="Avoid long walks"),
-                ]
-                mock_pref_service.get_user_preferences = MagicMock(
-                    return_value=stored_prefs
-                )
-
-                # Track the call to verify preferences are passed
-                captured_preferences = []
-
-                def mock_get_itineraries_with_insights(
-                    itineraries, user_preferences=None
-                ):
-                    captured_preferences.append(user_preferences)
-
-                mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                    side_effect=mock_get_itineraries_with_insights
-                )
-
-                response = client.post(
-                    "/api/v1/routes/search",
-                    json={
-                        "origin": {"latitude": 60.1699, "longitude": 24.9384},
-                        "destination": {
-                            "latitude": 60.2055,
-                            "longitude": 24.6559,
-                        },
-                    },
-                    headers=headers,
-                )
-
-                assert response.status_code == 200
-                data = response.json()
-                assert len(data["itineraries"]) == 1
-
-                # Verify AI service was called with stored preferences
-                assert len(captured_preferences) == 1
-                assert {
-                    "prompt": "I prefer eco-friendly routes"
-                } in captured_preferences[0]
-                assert {"prompt": "Avoid long walks"} in captured_preferences[0]
-
-
-def test_search_routes_with_request_only_preferences(
-    db: Session, client: TestClient, sample_itineraries
+        )
+    return tuple(itineraries_with_insights)
+
+
+@pytest.fixture(autouse=True)
+def route_mocks(sample_itineraries):
+    """Patch the services used by the routes endpoint for every test."""
+    with patch_routes(
+        "routing_service",
+        "ai_agents_service",
+        "global_preference_service",
+        "route_preference_service",
+    ) as mocks:
+        route_mocks = SimpleNamespace(
+            routing=mocks["routing_service"],
+            ai=mocks["ai_agents_service"],
+            global_pref=mocks["global_preference_service"],
+            route_pref=mocks["route_preference_service"],
+        )
+        route_mocks.routing.get_itinaries = AsyncMock(
+            return_value=list(sample_itineraries)
+        )
+        # No insights (plain itineraries are returned) and no stored
+        # preferences unless a test says otherwise
+        route_mocks.ai.get_itineraries_with_insights = AsyncMock(
+            return_value=[]
+        )
+        route_mocks.global_pref.get_user_preferences.return_value = []
+        route_mocks.route_pref.get_preferences_by_coordinates.return_value = []
+        yield route_mocks
+
+
+@pytest.mark.asyncio
+async def test_search_routes_with_request_preferences(
+    test_user: User,
+    async_client: AsyncClient,
+    sample_itineraries,
+    sample_itineraries_with_insights,
+    route_mocks,
 ):
-    """Test route search with preferences only from request (no authentication)."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            mock_routing_service.get_itinaries = AsyncMock(
-                return_value=sample_itineraries
-            )
-
-            # Track the call to verify preferences
-            captured_preferences = []
-
-            def mock_get_itineraries_with_insights(
-                itineraries, user_preferences=None
-            ):
-                captured_preferences.append(user_preferences)
-
-            mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                side_effect=mock_get_itineraries_with_insights
-            )
+    """Test route search with preferences provided in request."""
+    headers = get_auth_header(test_user.id)
 
-            response = client.post(
-                "/api/v1/routes/search",
-                json={
-                    "origin": {"latitude": 60.1699, "longitude": 24.9384},
-                    "destination": {"latitude": 60.2055, "longitude": 24.6559},
-                    "preferences": ["prefer trams", "avoid crowded buses"],
-                },
-                headers=headers,
-            )
+    route_mocks.ai.get_itineraries_with_insights = AsyncMock(
+        return_value=list(sample_itineraries_with_insights)
+    )
 
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data["itineraries"]) == 1
+    response = await async_client.post(
+        "/api/v1/routes/search",
+        json={
+            **_BASE_BODY,
+            "preferences": ["prefer walking", "avoid crowded buses"],
+        },
+        headers=headers,
+    )
 
-            # Verify AI service was called with request preferences only
-            assert len(captured_preferences) == 1
-            assert {"prompt": "prefer trams"} in captured_preferences[0]
-            assert {"prompt": "avoid crowded buses"} in captured_preferences[0]
-            assert len(captured_preferences[0]) == 2  # Only request preferences
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["itineraries"]) == 1
+
+    # Verify AI service was called with preferences
+    route_mocks.ai.get_itineraries_with_insights.assert_called_once()
+    call_args = route_mocks.ai.get_itineraries_with_insights.call_args
+    assert call_args.args[0] == list(sample_itineraries)
+    assert call_args.args[1] == [
+        {"prompt": "prefer walking"},
+        {"prompt": "avoid crowded buses"},
+    ]
 
 
-def test_search_routes_without_preferences(
-    db: Session, client: TestClient, sample_itineraries
+@pytest.mark.asyncio
+async def test_search_routes_response_contract(
+    test_user: User,
+    async_client: AsyncClient,
+    sample_itineraries_with_insights,
+    route_mocks,
 ):
-    """Test route search without any preferences (should pass None to AI service)."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            mock_routing_service.get_itinaries = AsyncMock(
-                return_value=sample_itineraries
-            )
-
-            # Track the call to verify no preferences are passed
-            captured_preferences = []
-
-            def mock_get_itineraries_with_insights(
-                itineraries, user_preferences=None
-            ):
-                captured_preferences.append(user_preferences)
-
-            mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                side_effect=mock_get_itineraries_with_insights
-            )
-
-            response = client.post(
-                "/api/v1/routes/search",
-                json={
-                    "origin": {"latitude": 60.1699, "longitude": 24.9384},
-                    "destination": {"latitude": 60.2055, "longitude": 24.6559},
-                },
-                headers=headers,
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data["itineraries"]) == 1
-
-            # Verify AI service was called with None preferences
-            assert len(captured_preferences) == 1
-            assert captured_preferences[0] is None
+    """Test the JSON shape of a route search response with insights."""
+    route_mocks.ai.get_itineraries_with_insights = AsyncMock(
+        return_value=list(sample_itineraries_with_insights)
+    )
 
+    response = await async_client.post(
+        "/api/v1/routes/search",
+        json=_BASE_BODY,
+        headers=get_auth_header(test_user.id),
+    )
 
-def test_search_routes_preference_service_graceful_degradation(
-    db: Session, client: TestClient, sample_itineraries
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert data["origin"] == {"latitude": 60.1699, "longitude": 24.9384}
+    assert data["destination"] == {"latitude": 60.2055, "longitude": 24.6559}
+    assert "search_time" in data
+
+    itinerary = data["itineraries"][0]
+    assert itinerary["start"] == "2025-10-14T10:00:00Z"
+    assert itinerary["end"] == "2025-10-14T10:45:00Z"
+    assert itinerary["duration"] == 2700
+    assert itinerary["walk_distance"] == 500.0
+    assert itinerary["walk_time"] == 400
+    assert itinerary["ai_insight"] == "Route optimized based on preferences"
+
+    walk_leg, bus_leg = itinerary["legs"]
+    assert walk_leg["mode"] == "WALK"
+    assert walk_leg["route"] is None
+    assert walk_leg["from_place"] == {
+        "coordinates": {"latitude": 60.1699, "longitude": 24.9384},
+        "name": "Origin",
+    }
+    assert walk_leg["ai_insight"] == "Optimized leg insight"
+    assert bus_leg["mode"] == "BUS"
+    assert bus_leg["distance"] == 15000.0
+    assert bus_leg["route"] == {
+        "short_name": "550",
+        "long_name": "Helsinki - Espoo",
+        "description": "Express bus service",
+    }
+    assert bus_leg["to_place"]["name"] == "Destination"
+
+
+SEARCH_PREFERENCE_CASES = [
+    {
+        "id": "request_only",
+        "request_prefs": ["prefer trams", "avoid crowded buses"],
+        "global_prefs": [],
+        "route_prefs": [],
+        "expected": [
+            {"prompt": "prefer trams"},
+            {"prompt": "avoid crowded buses"},
+        ],
+    },
+    {
+        "id": "stored_global",
+        "request_prefs": None,
+        "global_prefs": ["I prefer eco-friendly routes", "Avoid long walks"],
+        "route_prefs": [],
+        "expected": [
+            {"prompt": "I prefer eco-friendly routes"},
+            {"prompt": "Avoid long walks"},
+        ],
+    },
+    {
+        # Empty preferences are passed to the AI service as None
+        "id": "no_preferences",
+        "request_prefs": None,
+        "global_prefs": [],
+        "route_prefs": [],
+        "expected": None,
+    },
+    {
+        "id": "route_specific",
+        "request_prefs": None,
+        "global_prefs": [],
+        "route_prefs": ["Prefer scenic routes in this area"],
+        "expected": [{"prompt": "Prefer scenic routes in this area"}],
+    },
+    {
+        "id": "global_and_route_specific",
+        "request_prefs": None,
+        "global_prefs": ["I prefer eco-friendly routes"],
+        "route_prefs": ["Avoid construction on this route"],
+        "expected": [
+            {"prompt": "I prefer eco-friendly routes"},
+            {"prompt": "Avoid construction on this route"},
+        ],
+    },
+    {
+        "id": "all_preference_types",
+        "request_prefs": ["prefer faster routes"],
+        "global_prefs": ["I prefer eco-friendly routes"],
+        "route_prefs": ["Avoid construction on this route"],
+        "expected": [
+            {"prompt": "prefer faster routes"},
+            {"prompt": "I prefer eco-friendly routes"},
+            {"prompt": "Avoid construction on this route"},
+        ],
+    },
+    {
+        "id": "no_matching_route_preferences",
+        "request_prefs": None,
+        "global_prefs": ["I prefer eco-friendly routes"],
+        "route_prefs": [],
+        "expected": [{"prompt": "I prefer eco-friendly routes"}],
+    },
+    {
+        # Route search degrades gracefully when the lookup fails
+        "id": "route_preference_service_failure",
+        "request_prefs": None,
+        "global_prefs": ["I prefer eco-friendly routes"],
+        "route_prefs": Exception("Database error"),
+        "expected": [{"prompt": "I prefer eco-friendly routes"}],
+    },
+]
+
+
+@pytest.mark.parametrize(
+    "case",
+    SEARCH_PREFERENCE_CASES,
+    ids=[case["id"] for case in SEARCH_PREFERENCE_CASES],
+)
+@pytest.mark.asyncio
+async def test_search_routes_with_preferences(
+    case: dict,
+    test_user: User,
+    db: Session,
+    async_client: AsyncClient,
+    sample_itineraries,
+    route_mocks,
 ):
-    """Test that route search still works when preferences are empty."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            mock_routing_service.get_itinaries = AsyncMock(
-                return_value=sample_itineraries
-            )
+    """Test which preferences route search passes on to the AI service."""
+    headers = get_auth_header(test_user.id)
 
-            # Track the call to verify preferences handling
-            captured_preferences = []
-
-            def mock_get_itineraries_with_insights(
-                itineraries, user_preferences=None
-            ):
-                captured_preferences.append(user_preferences)
-
-            mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                side_effect=mock_get_itineraries_with_insights
-            )
-
-            response = client.post(
-                "/api/v1/routes/search",
-                json={
-                    "origin": {"latitude": 60.1699, "longitude": 24.9384},
-                    "destination": {"latitude": 60.2055, "longitude": 24.6559},
-                },
-                headers=headers,
-            )
+    # The endpoint only reads .prompt, so plain stand-ins replace ORM rows
+    route_mocks.global_pref.get_user_preferences.return_value = [
+        SimpleNamespace(prompt=prompt) for prompt in case["global_prefs"]
+    ]
+    get_route_prefs = route_mocks.route_pref.get_preferences_by_coordinates
+    if isinstance(case["route_prefs"], Exception):
+        get_route_prefs.side_effect = case["route_prefs"]
+    else:
+        get_route_prefs.return_value = [
+            SimpleNamespace(prompt=prompt) for prompt in case["route_prefs"]
+        ]
+
+    body = _BASE_BODY
+    if case["request_prefs"] is not None:
+        body = {**_BASE_BODY, "preferences": case["request_prefs"]}
+
+    response = await async_client.post(
+        "/api/v1/routes/search", json=body, headers=headers
+    )
 
-            # Should succeed without preferences
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data["itineraries"]) == 1
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["itineraries"]) == 1
 
-            # Verify AI service was called with None (user has no stored preferences)
-            assert len(captured_preferences) == 1
-            # User has no preferences, so empty list gets passed as None
-            assert (
-                captured_preferences[0] is None or captured_preferences[0] == []
-            )
+    # Global preferences are looked up for the authenticated user
+    route_mocks.global_pref.get_user_preferences.assert_called_once_with(
+        db, test_user.id
+    )
 
+    # Route preferences are looked up with the searched coordinates
+    get_route_prefs.assert_called_once_with(
+        db, test_user.id, 60.1699, 24.9384, 60.2055, 24.6559
+    )
 
-def test_search_routes_with_route_specific_preferences(
-    db: Session, client: TestClient, sample_itineraries
-):
-    """Test route search with route-specific preferences matching coordinates."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            with patch(
-                "app.api.v1.endpoints.routes.route_preference_service"
-            ) as mock_route_pref_service:
-                mock_routing_service.get_itinaries = AsyncMock(
-                    return_value=sample_itineraries
-                )
-
-                # Mock route-specific preferences matching the coordinates
-                route_prefs = [
-                    RoutePreference(
-                        user_id=1,
-                        prompt="Prefer scenic routes in this area",
-                        from_latitude=60.1699,
-                        from_longitude=24.9384,
-                        to_latitude=60.2055,
-                        to_longitude=24.6559,
-                    ),
-                ]
-                mock_route_pref_service.get_preferences_by_coordinates = (
-                    MagicMock(return_value=route_prefs)
-                )
-
-                # Track the call to verify preferences are passed
-                captured_preferences = []
-
-                def mock_get_itineraries_with_insights(
-                    itineraries, user_preferences=None
-                ):
-                    captured_preferences.append(user_preferences)
-
-                mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                    side_effect=mock_get_itineraries_with_insights
-                )
-
-                response = client.post(
-                    "/api/v1/routes/search",
-                    json={
-                        "origin": {"latitude": 60.1699, "longitude": 24.9384},
-                        "destination": {
-                            "latitude": 60.2055,
-                            "longitude": 24.6559,
-                        },
-                    },
-                    headers=headers,
-                )
-
-                assert response.status_code == 200
-                data = response.json()
-                assert len(data["itineraries"]) == 1
-
-                # Verify route preference service was called with correct coordinates
-                mock_route_pref_service.get_preferences_by_coordinates.assert_called_once_with(
-                    db, user.id, 60.1699, 24.9384, 60.2055, 24.6559
-                )
-
-                # Verify AI service was called with route-specific preferences
-                assert len(captured_preferences) == 1
-                assert {
-                    "prompt": "Prefer scenic routes in this area"
-                } in captured_preferences[0]
-
-
-def test_search_routes_with_global_and_route_specific_preferences(
-    db: Session, client: TestClient, sample_itineraries
-):
-    """Test route search combining global and route-specific preferences."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            with patch(
-                "app.api.v1.endpoints.routes.global_preference_service"
-            ) as mock_global_pref_service:
-                with patch(
-                    "app.api.v1.endpoints.routes.route_preference_service"
-                ) as mock_route_pref_service:
-                    mock_routing_service.get_itinaries = AsyncMock(
-                        return_value=sample_itineraries
-                    )
-
-                    # Mock global preferences
-                    global_prefs = [
-                        GlobalPreference(
-                            user_id=1, prompt="I prefer eco-friendly routes"
-                        ),
-                    ]
-                    mock_global_pref_service.get_user_preferences = MagicMock(
-                        return_value=global_prefs
-                    )
-
-                    # Mock route-specific preferences
-                    route_prefs = [
-                        RoutePreference(
-                            user_id=1,
-                            prompt="Avoid construction on this route",
-                            from_latitude=60.1699,
-                            from_longitude=24.9384,
-                            to_latitude=60.2055,
-                            to_longitude=24.6559,
-                        ),
-                    ]
-                    mock_route_pref_service.get_preferences_by_coordinates = (
-                        MagicMock(return_value=route_prefs)
-                    )
-
-                    # Track the call to verify preferences are passed
-                    captured_preferences = []
-
-                    def mock_get_itineraries_with_insights(
-                        itineraries, user_preferences=None
-                    ):
-                        captured_preferences.append(user_preferences)
-
-                    mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                        side_effect=mock_get_itineraries_with_insights
-                    )
-
-                    response = client.post(
-                        "/api/v1/routes/search",
-                        json={
-                            "origin": {
-                                "latitude": 60.1699,
-                                "longitude": 24.9384,
-                            },
-                            "destination": {
-                                "latitude": 60.2055,
-                                "longitude": 24.6559,
-                            },
-                        },
-                        headers=headers,
-                    )
-
-                    assert response.status_code == 200
-                    data = response.json()
-                    assert len(data["itineraries"]) == 1
-
-                    # Verify AI service was called with both types of preferences
-                    assert len(captured_preferences) == 1
-                    # Should include both global and route-specific preferences
-                    assert {"prompt": "I prefer eco-friendly routes"} in (
-                        captured_preferences[0]
-                    )
-                    assert {
-                        "prompt": "Avoid construction on this route"
-                    } in captured_preferences[0]
-                    assert len(captured_preferences[0]) == 2
-
-
-def test_search_routes_with_all_preference_types(
-    db: Session, client: TestClient, sample_itineraries
-):
-    """Test route search combining request, global, and route-specific preferences."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            with patch(
-                "app.api.v1.endpoints.routes.global_preference_service"
-            ) as mock_global_pref_service:
-                with patch(
-                    "app.api.v1.endpoints.routes.route_preference_service"
-                ) as mock_route_pref_service:
-                    mock_routing_service.get_itinaries = AsyncMock(
-                        return_value=sample_itineraries
-                    )
-
-                    # Mock global preferences
-                    global_prefs = [
-                        GlobalPreference(
-                            user_id=1, prompt="I prefer eco-friendly routes"
-                        ),
-                    ]
-                    mock_global_pref_service.get_user_preferences = MagicMock(
-                        return_value=global_prefs
-                    )
-
-                    # Mock route-specific preferences
-                    route_prefs = [
-                        RoutePreference(
-                            user_id=1,
-                            prompt="Avoid construction on this route",
-                            from_latitude=60.1699,
-                            from_longitude=24.9384,
-                            to_latitude=60.2055,
-                            to_longitude=24.6559,
-                        ),
-                    ]
-                    mock_route_pref_service.get_preferences_by_coordinates = (
-                        MagicMock(return_value=route_prefs)
-                    )
-
-                    # Track the call to verify preferences are passed
-                    captured_preferences = []
-
-                    def mock_get_itineraries_with_insights(
-                        itineraries, user_preferences=None
-                    ):
-                        captured_preferences.append(user_preferences)
-
-                    mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                        side_effect=mock_get_itineraries_with_insights
-                    )
-
-                    response = client.post(
-                        "/api/v1/routes/search",
-                        json={
-                            "origin": {
-                                "latitude": 60.1699,
-                                "longitude": 24.9384,
-                            },
-                            "destination": {
-                                "latitude": 60.2055,
-                                "longitude": 24.6559,
-                            },
-                            "preferences": ["prefer faster routes"],
-                        },
-                        headers=headers,
-                    )
-
-                    assert response.status_code == 200
-                    data = response.json()
-                    assert len(data["itineraries"]) == 1
-
-                    # Verify AI service was called with all three types of preferences
-                    assert len(captured_preferences) == 1
-                    # Should include request, global, and route-specific preferences
-                    assert {"prompt": "prefer faster routes"} in (
-                        captured_preferences[0]
-                    )
-                    assert {"prompt": "I prefer eco-friendly routes"} in (
-                        captured_preferences[0]
-                    )
-                    assert {
-                        "prompt": "Avoid construction on this route"
-                    } in captured_preferences[0]
-                    assert len(captured_preferences[0]) == 3
-
-
-def test_search_routes_with_no_matching_route_preferences(
-    db: Session, client: TestClient, sample_itineraries
-):
-    """Test route search when no route preferences match the coordinates."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            with patch(
-                "app.api.v1.endpoints.routes.global_preference_service"
-            ) as mock_global_pref_service:
-                with patch(
-                    "app.api.v1.endpoints.routes.route_preference_service"
-                ) as mock_route_pref_service:
-                    mock_routing_service.get_itinaries = AsyncMock(
-                        return_value=sample_itineraries
-                    )
-
-                    # Mock global preferences
-                    global_prefs = [
-                        GlobalPreference(
-                            user_id=1, prompt="I prefer eco-friendly routes"
-                        ),
-                    ]
-                    mock_global_pref_service.get_user_preferences = MagicMock(
-                        return_value=global_prefs
-                    )
-
-                    # No route-specific preferences matching coordinates
-                    mock_route_pref_service.get_preferences_by_coordinates = (
-                        MagicMock(return_value=[])
-                    )
-
-                    # Track the call to verify preferences are passed
-                    captured_preferences = []
-
-                    def mock_get_itineraries_with_insights(
-                        itineraries, user_preferences=None
-                    ):
-                        captured_preferences.append(user_preferences)
-
-                    mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                        side_effect=mock_get_itineraries_with_insights
-                    )
-
-                    response = client.post(
-                        "/api/v1/routes/search",
-                        json={
-                            "origin": {
-                                "latitude": 60.1699,
-                                "longitude": 24.9384,
-                            },
-                            "destination": {
-                                "latitude": 60.2055,
-                                "longitude": 24.6559,
-                            },
-                        },
-                        headers=headers,
-                    )
-
-                    assert response.status_code == 200
-                    data = response.json()
-                    assert len(data["itineraries"]) == 1
-
-                    # Verify AI service was called with only global preferences
-                    assert len(captured_preferences) == 1
-                    # Should only include global preferences (no route-specific)
-                    assert {"prompt": "I prefer eco-friendly routes"} in (
-                        captured_preferences[0]
-                    )
-                    assert len(captured_preferences[0]) == 1
-
-
-def test_search_routes_route_preference_service_failure(
-    db: Session, client: TestClient, sample_itineraries
-):
-    """Test graceful degradation when route preference service fails."""
-    user = create_test_user(db)
-    headers = get_auth_header(user.id)
-
-    with patch(
-        "app.api.v1.endpoints.routes.routing_service"
-    ) as mock_routing_service:
-        with patch(
-            "app.api.v1.endpoints.routes.ai_agents_service"
-        ) as mock_ai_service:
-            with patch(
-                "app.api.v1.endpoints.routes.global_preference_service"
-            ) as mock_global_pref_service:
-                with patch(
-                    "app.api.v1.endpoints.routes.route_preference_service"
-                ) as mock_route_pref_service:
-                    mock_routing_service.get_itinaries = AsyncMock(
-                        return_value=sample_itineraries
-                    )
-
-                    # Mock global preferences
-                    global_prefs = [
-                        GlobalPreference(
-                            user_id=1, prompt="I prefer eco-friendly routes"
-                        ),
-                    ]
-                    mock_global_pref_service.get_user_preferences = MagicMock(
-                        return_value=global_prefs
-                    )
-
-                    # Route preference service fails
-                    mock_route_pref_service.get_preferences_by_coordinates = (
-                        MagicMock(side_effect=Exception("Database error"))
-                    )
-
-                    # Track the call to verify preferences are passed
-                    captured_preferences = []
-
-                    def mock_get_itineraries_with_insights(
-                        itineraries, user_preferences=None
-                    ):
-                        captured_preferences.append(user_preferences)
-
-                    mock_ai_service.get_itineraries_with_insights = AsyncMock(
-                        side_effect=mock_get_itineraries_with_insights
-                    )
-
-                    response = client.post(
-                        "/api/v1/routes/search",
-                        json={
-                            "origin": {
-                                "latitude": 60.1699,
-                                "longitude": 24.9384,
-                            },
-                            "destination": {
-                                "latitude": 60.2055,
-                                "longitude": 24.6559,
-                            },
-                        },
-                        headers=headers,
-                    )
-
-                    # Should still succeed despite route preference service failure
-                    assert response.status_code == 200
-                    data = response.json()
-                    assert len(data["itineraries"]) == 1
-
-                    # Verify AI service was called with only global preferences
-                    assert len(captured_preferences) == 1
-                    # Should still include global preferences
-                    assert {"prompt": "I prefer eco-friendly routes"} in (
-                        captured_preferences[0]
-                    )
-                    assert len(captured_preferences[0]) == 1
+    # The AI service is called once with the merged preferences
+    route_mocks.ai.get_itineraries_with_insights.assert_awaited_once_with(
+        list(sample_itineraries), case["expected"]
+    )
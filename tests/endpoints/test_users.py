@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from fastapi.testclient import TestClient
 from sqlalchemy import inspect
 from sqlalchemy.orm import Session
@@ -6,23 +8,28 @@ from app.models.user import User
 from app.services.auth_service import auth_service
 
 
-def create_test_user(db: Session):
+def create_test_user(db: Session, hashed_password: str):
     """Helper function to create a test user and return its data"""
     username = "testuser"
     user = User(
         username=username,
-        hashed_password=auth_service.get_password_hash("testpassword"),
+        hashed_password=hashed_password,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # Flushing is enough to assign user.id; no refresh SELECT needed
+    db.flush()
     return user
 
 
+@lru_cache(maxsize=None)
+def _token_for(user_id: int) -> str:
+    """Generate (and cache) an access token for the given user id"""
+    return auth_service.generate_access_token(user_id)
+
+
 def get_auth_header(user_id: int):
     """Helper function to generate authorization header with token"""
-    token = auth_service.generate_access_token(user_id)
-    return {"Authorization": f"Bearer {token}"}
+    return {"Authorization": f"Bearer {_token_for(user_id)}"}
 
 
 def test_create_user_table(db: Session):
@@ -35,9 +42,11 @@ def test_create_user_table(db: Session):
     assert "users" in tables
 
 
-def test_read_current_user(db: Session, client: TestClient):
+def test_read_current_user(
+    db: Session, client: TestClient, hashed_test_password: str
+):
     """Test getting the current user details"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
 
     headers = get_auth_header(user.id)
 
@@ -2,8 +2,9 @@
 Unit tests for AI agents service.
 """
 
-from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
 import httpx
 import pytest
@@ -13,176 +14,176 @@ from app.schemas.itinary import Itinerary, Leg, Route, TransportMode
 from app.schemas.location import Place
 from app.services.ai_agents_service import AiAgentsService
 
-
-@pytest.fixture
+# The tests only await mocked I/O, so they can share one event loop
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+_T0 = datetime(2025, 10, 14, 10, 0, 0, tzinfo=timezone.utc)
+_T10 = _T0 + timedelta(minutes=10)
+_T30 = _T0 + timedelta(minutes=30)
+_T45 = _T0 + timedelta(minutes=45)
+
+# The sample data is literal and known-valid, so the models are built with
+# model_construct to skip Pydantic validation.
+_HELSINKI_CENTRAL = Place.model_construct(
+    coordinates=Coordinates.model_construct(
+        latitude=60.1699, longitude=24.9384
+    ),
+    name="Helsinki Central",
+)
+_ESPOO_CENTRAL = Place.model_construct(
+    coordinates=Coordinates.model_construct(
+        latitude=60.2055, longitude=24.6559
+    ),
+    name="Espoo Central",
+)
+_ORIGIN = Place.model_construct(
+    coordinates=Coordinates.model_construct(
+        latitude=60.1699, longitude=24.9384
+    ),
+    name="Origin",
+)
+_BUS_STOP = Place.model_construct(
+    coordinates=Coordinates.model_construct(
+        latitude=60.1710, longitude=24.9400
+    ),
+    name="Bus Stop",
+)
+_DESTINATION = Place.model_construct(
+    coordinates=Coordinates.model_construct(
+        latitude=60.2055, longitude=24.6559
+    ),
+    name="Destination",
+)
+_ROUTE_550 = Route.model_construct(
+    short_name="550",
+    long_name="Helsinki - Espoo",
+    description="Express bus service",
+)
+
+
+@pytest.fixture(scope="session")
 def ai_service():
-    """Create an AI agents service instance for testing."""
+    """Create an AI agents service instance shared by the test session."""
     return AiAgentsService()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_leg():
     """Create a sample leg for testing."""
-    return Leg(
+    return Leg.model_construct(
         mode=TransportMode.BUS,
-        start=datetime(2025, 10, 14, 10, 0, 0, tzinfo=timezone.utc),
-        end=datetime(2025, 10, 14, 10, 30, 0, tzinfo=timezone.utc),
+        start=_T0,
+        end=_T30,
         duration=1800,
         distance=10000.0,
-        from_place=Place(
-            coordinates=Coordinates(latitude=60.1699, longitude=24.9384),
-            name="Helsinki Central",
-        ),
-        to_place=Place(
-            coordinates=Coordinates(latitude=60.2055, longitude=24.6559),
-            name="Espoo Central",
-        ),
-        route=Route(
-            short_name="550",
-            long_name="Helsinki - Espoo",
-            description="Express bus service",
-        ),
+        from_place=_HELSINKI_CENTRAL,
+        to_place=_ESPOO_CENTRAL,
+        route=_ROUTE_550,
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_walk_leg():
     """Create a sample walking leg for testing."""
-    return Leg(
+    return Leg.model_construct(
         mode=TransportMode.WALK,
-        start=datetime(2025, 10, 14, 10, 0, 0, tzinfo=timezone.utc),
-        end=datetime(2025, 10, 14, 10, 10, 0, tzinfo=timezone.utc),
+        start=_T0,
+        end=_T10,
         duration=600,
         distance=500.0,
-        from_place=Place(
-            coordinates=Coordinates(latitude=60.1699, longitude=24.9384),
-            name="Origin",
-        ),
-        to_place=Place(
-            coordinates=Coordinates(latitude=60.1710, longitude=24.9400),
-            name="Bus Stop",
-        ),
+        from_place=_ORIGIN,
+        to_place=_BUS_STOP,
         route=None,
     )
 
 
-@pytest.mark.asyncio
-async def test_health_check_success(ai_service):
-    """Test successful health check."""
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-
-    with patch.object(ai_service, "_get_client") as mock_get_client:
-        mock_client = AsyncMock()
-        mock_client.get = AsyncMock(return_value=mock_response)
-        mock_get_client.return_value = mock_client
-
-        health = await ai_service.health_check()
+@pytest.fixture(scope="session")
+def ai_api():
+    """Serve the AI agents API from an in-process httpx mock transport."""
+    api = SimpleNamespace(respond=None)
+    api.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: api.respond(request)),
+        base_url="http://test",
+    )
+    yield api
+    asyncio.run(api.client.aclose())
 
-        assert health.healthy is True
-        assert "responding" in health.message.lower()
 
+@pytest.fixture(autouse=True)
+def use_ai_api(ai_service, ai_api, monkeypatch):
+    """Route the service through the mock API, answering 200 by default."""
+    monkeypatch.setattr(ai_service, "_client", ai_api.client)
+    monkeypatch.setattr(ai_api, "respond", _respond_ok)
 
-@pytest.mark.asyncio
-async def test_health_check_failure(ai_service):
-    """Test health check with non-200 status."""
-    mock_response = MagicMock()
-    mock_response.status_code = 503
 
-    with patch.object(ai_service, "_get_client") as mock_get_client:
-        mock_client = AsyncMock()
-        mock_client.get = AsyncMock(return_value=mock_response)
-        mock_get_client.return_value = mock_client
+def _respond_ok(request):
+    """Mock API handler that answers 200"""
+    return httpx.Response(200)
 
-        health = await ai_service.health_check()
 
-        assert health.healthy is False
-        assert "503" in health.message
+def _respond_unavailable(request):
+    """Mock API handler that answers 503"""
+    return httpx.Response(503)
 
 
-@pytest.mark.asyncio
-async def test_health_check_timeout(ai_service):
-    """Test health check with timeout."""
-    with patch.object(ai_service, "_get_client") as mock_get_client:
-        mock_client = AsyncMock()
-        mock_client.get = AsyncMock(
-            side_effect=httpx.TimeoutException("Timeout")
-        )
-        mock_get_client.return_value = mock_client
+def _raise(exc: Exception):
+    """Build a mock API handler that fails with the given exception"""
 
-        health = await ai_service.health_check()
+    def respond(request):
+        raise exc
 
-        assert health.healthy is False
-        assert "timed out" in health.message.lower()
+    return respond
 
 
-@pytest.mark.asyncio
-async def test_health_check_exception(ai_service):
-    """Test health check with exception."""
-    with patch.object(ai_service, "_get_client") as mock_get_client:
-        mock_client = AsyncMock()
-        mock_client.get = AsyncMock(side_effect=Exception("Connection error"))
-        mock_get_client.return_value = mock_client
+@pytest.mark.parametrize(
+    ("respond", "healthy", "message"),
+    [
+        (_respond_ok, True, "responding"),
+        (_respond_unavailable, False, "503"),
+        (_raise(httpx.TimeoutException("Timeout")), False, "timed out"),
+        (_raise(Exception("Connection error")), False, "failed"),
+    ],
+    ids=["success", "failure", "timeout", "exception"],
+)
+async def test_health_check(ai_service, ai_api, respond, healthy, message):
+    """Test health check against healthy, failing and unreachable APIs."""
+    ai_api.respond = respond
 
-        health = await ai_service.health_check()
+    health = await ai_service.health_check()
 
-        assert health.healthy is False
-        assert "failed" in health.message.lower()
+    assert health.healthy is healthy
+    assert message in health.message.lower()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_itinerary():
     """Create a sample itinerary for testing."""
-    return Itinerary(
-        start=datetime(2025, 10, 14, 10, 0, 0, tzinfo=timezone.utc),
-        end=datetime(2025, 10, 14, 10, 45, 0, tzinfo=timezone.utc),
+    return Itinerary.model_construct(
+        start=_T0,
+        end=_T45,
         duration=2700,
         walk_distance=500.0,
         walk_time=400,
         legs=[
-            Leg(
+            Leg.model_construct(
                 mode=TransportMode.WALK,
-                start=datetime(2025, 10, 14, 10, 0, 0, tzinfo=timezone.utc),
-                end=datetime(2025, 10, 14, 10, 10, 0, tzinfo=timezone.utc),
+                start=_T0,
+                end=_T10,
                 duration=600,
                 distance=500.0,
-                from_place=Place(
-                    coordinates=Coordinates(
-                        latitude=60.1699, longitude=24.9384
-                    ),
-                    name="Origin",
-                ),
-                to_place=Place(
-                    coordinates=Coordinates(
-                        latitude=60.1710, longitude=24.9400
-                    ),
-                    name="Bus Stop",
-                ),
+                from_place=_ORIGIN,
+                to_place=_BUS_STOP,
                 route=None,
             ),
-            Leg(
+            Leg.model_construct(
                 mode=TransportMode.BUS,
-                start=datetime(2025, 10, 14, 10, 10, 0, tzinfo=timezone.utc),
-                end=datetime(2025, 10, 14, 10, 45, 0, tzinfo=timezone.utc),
+                start=_T10,
+                end=_T45,
                 duration=2100,
                 distance=15000.0,
-                from_place=Place(
-                    coordinates=Coordinates(
-                        latitude=60.1710, longitude=24.9400
-                    ),
-                    name="Bus Stop",
-                ),
-                to_place=Place(
-                    coordinates=Coordinates(
-                        latitude=60.2055, longitude=24.6559
-                    ),
-                    name="Destination",
-                ),
-                route=Route(
-                    short_name="550",
-                    long_name="Helsinki - Espoo",
-                    description="Express bus service",
-                ),
+                from_place=_BUS_STOP,
+                to_place=_DESTINATION,
+                route=_ROUTE_550,
             ),
         ],
     )
@@ -1,51 +1,77 @@
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.global_preference import GlobalPreference
 from app.models.user import User
 from app.schemas.global_preference import GlobalPreferenceCreate
-from app.services.auth_service import auth_service
 from app.services.global_preference_service import global_preference_service
 
 
-def create_test_user(db: Session) -> User:
+def create_test_user(db: Session, hashed_password: str) -> User:
     """Helper function to create a test user"""
     user = User(
         username="testuser",
-        hashed_password=auth_service.get_password_hash("testpassword"),
+        hashed_password=hashed_password,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
 
+def create_test_users(
+    db: Session, hashed_password: str, *usernames: str
+) -> list[User]:
+    """Helper function to create several test users with a single INSERT"""
+    users = db.scalars(
+        insert(User).returning(User, sort_by_parameter_order=True),
+        [
+            {"username": username, "hashed_password": hashed_password}
+            for username in usernames
+        ],
+    ).all()
+    return list(users)
+
+
 def create_test_preference(
     db: Session, user_id: int, prompt: str
 ) -> GlobalPreference:
     """Helper function to create a test global preference"""
     preference = GlobalPreference(user_id=user_id, prompt=prompt)
     db.add(preference)
-    db.commit()
-    db.refresh(preference)
+    db.flush()
     return preference
 
 
-def test_get_user_preferences_empty(db: Session):
+def create_test_preferences(
+    db: Session, user_id: int, *prompts: str
+) -> list[GlobalPreference]:
+    """Helper function to create several global preferences in one INSERT"""
+    preferences = db.scalars(
+        insert(GlobalPreference).returning(
+            GlobalPreference, sort_by_parameter_order=True
+        ),
+        [{"user_id": user_id, "prompt": prompt} for prompt in prompts],
+    ).all()
+    return list(preferences)
+
+
+def test_get_user_preferences_empty(db: Session, hashed_test_password: str):
     """Test getting preferences when user has none"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
 
     preferences = global_preference_service.get_user_preferences(db, user.id)
 
     assert preferences == []
 
 
-def test_get_user_preferences(db: Session):
+def test_get_user_preferences(db: Session, hashed_test_password: str):
     """Test getting preferences for a user"""
-    user = create_test_user(db)
-    pref1 = create_test_preference(db, user.id, "Prefer direct routes")
-    pref2 = create_test_preference(db, user.id, "Avoid buses")
+    user = create_test_user(db, hashed_test_password)
+    pref1, pref2 = create_test_preferences(
+        db, user.id, "Prefer direct routes", "Avoid buses"
+    )
 
     preferences = global_preference_service.get_user_preferences(db, user.id)
 
@@ -56,9 +82,9 @@ def test_get_user_preferences(db: Session):
     assert preferences[1].prompt == "Avoid buses"
 
 
-def test_get_preference_by_id(db: Session):
+def test_get_preference_by_id(db: Session, hashed_test_password: str):
     """Test getting a preference by ID"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
     pref = create_test_preference(db, user.id, "Test preference")
 
     result = global_preference_service.get_preference_by_id(db, pref.id)
@@ -75,9 +101,9 @@ def test_get_preference_by_id_not_found(db: Session):
     assert result is None
 
 
-def test_create_preference(db: Session):
+def test_create_preference(db: Session, hashed_test_password: str):
     """Test creating a new preference"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
     preference_in = GlobalPreferenceCreate(prompt="Prefer trains over buses")
 
     preference = global_preference_service.create_preference(
@@ -90,9 +116,11 @@ def test_create_preference(db: Session):
     assert preference.created_at is not None
 
 
-def test_create_preference_strips_whitespace(db: Session):
+def test_create_preference_strips_whitespace(
+    db: Session, hashed_test_password: str
+):
     """Test that creating a preference strips leading/trailing whitespace"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
     preference_in = GlobalPreferenceCreate(prompt="  Avoid crowded routes  ")
 
     preference = global_preference_service.create_preference(
@@ -102,9 +130,9 @@ def test_create_preference_strips_whitespace(db: Session):
     assert preference.prompt == "Avoid crowded routes"
 
 
-def test_create_preference_empty_prompt(db: Session):
+def test_create_preference_empty_prompt(db: Session, hashed_test_password: str):
     """Test creating a preference with empty prompt raises error"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
     preference_in = GlobalPreferenceCreate(prompt="")
 
     with pytest.raises(HTTPException) as exc_info:
@@ -114,9 +142,11 @@ def test_create_preference_empty_prompt(db: Session):
     assert "cannot be empty" in exc_info.value.detail
 
 
-def test_create_preference_whitespace_only_prompt(db: Session):
+def test_create_preference_whitespace_only_prompt(
+    db: Session, hashed_test_password: str
+):
     """Test creating a preference with whitespace-only prompt raises error"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
     preference_in = GlobalPreferenceCreate(prompt="   ")
 
     with pytest.raises(HTTPException) as exc_info:
@@ -126,9 +156,9 @@ def test_create_preference_whitespace_only_prompt(db: Session):
     assert "cannot be empty" in exc_info.value.detail
 
 
-def test_delete_preference(db: Session):
+def test_delete_preference(db: Session, hashed_test_password: str):
     """Test deleting a preference"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
     pref = create_test_preference(db, user.id, "Test preference")
 
     result = global_preference_service.delete_preference(db, user.id, pref.id)
@@ -139,9 +169,9 @@ def test_delete_preference(db: Session):
     assert deleted_pref is None
 
 
-def test_delete_preference_not_found(db: Session):
+def test_delete_preference_not_found(db: Session, hashed_test_password: str):
     """Test deleting a non-existent preference raises error"""
-    user = create_test_user(db)
+    user = create_test_user(db, hashed_test_password)
 
     with pytest.raises(HTTPException) as exc_info:
         global_preference_service.delete_preference(db, user.id, 99999)
@@ -150,16 +180,11 @@ def test_delete_preference_not_found(db: Session):
     assert "not found" in exc_info.value.detail
 
 
-def test_delete_preference_wrong_user(db: Session):
+def test_delete_preference_wrong_user(db: Session, hashed_test_password: str):
     """Test deleting another user's preference raises error"""
-    user1 = create_test_user(db)
-    user2 = User(
-        username="otheruser",
-        hashed_password=auth_service.get_password_hash("password"),
+    user1, user2 = create_test_users(
+        db, hashed_test_password, "testuser", "otheruser"
     )
-    db.add(user2)
-    db.commit()
-    db.refresh(user2)
 
     pref = create_test_preference(db, user1.id, "User1's preference")
 
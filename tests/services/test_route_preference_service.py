@@ -1,26 +1,70 @@
 import pytest
 from fastapi import HTTPException
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
 
 from app.models.route_preference import RoutePreference
 from app.models.user import User
 from app.schemas.route_preference import RoutePreferenceCreate
-from app.services.auth_service import auth_service
 from app.services.route_preference_service import route_preference_service
 
+# No test here logs in, so users get a bcrypt-shaped placeholder, not a hash
+_PLACEHOLDER_PASSWORD_HASH = "$2b$04$" + "x" * 53
+
+_DEFAULT_COORDS = {
+    "from_latitude": 60.1699,
+    "from_longitude": 24.9384,
+    "to_latitude": 60.2055,
+    "to_longitude": 24.6559,
+}
+_TRAINS_PREF = RoutePreferenceCreate(
+    prompt="Prefer trains over buses", **_DEFAULT_COORDS
+)
+_PADDED_PREF = RoutePreferenceCreate(
+    prompt="  Avoid crowded routes  ", **_DEFAULT_COORDS
+)
+# The service rejects these, so they skip schema validation
+_EMPTY_PREF = RoutePreferenceCreate.model_construct(
+    prompt="", **_DEFAULT_COORDS
+)
+_WHITESPACE_PREF = RoutePreferenceCreate.model_construct(
+    prompt="   ", **_DEFAULT_COORDS
+)
+_EDGE_COORDS_PREF = RoutePreferenceCreate(
+    prompt="Edge case test",
+    from_latitude=-90.0,
+    from_longitude=-180.0,
+    to_latitude=90.0,
+    to_longitude=180.0,
+)
+
 
 def create_test_user(db: Session) -> User:
     """Helper function to create a test user"""
     user = User(
         username="testuser",
-        hashed_password=auth_service.get_password_hash("testpassword"),
+        hashed_password=_PLACEHOLDER_PASSWORD_HASH,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    db.flush()
     return user
 
 
+def create_test_users(db: Session, *usernames: str) -> list[User]:
+    """Helper function to create several test users with a single INSERT"""
+    users = db.scalars(
+        insert(User).returning(User, sort_by_parameter_order=True),
+        [
+            {
+                "username": username,
+                "hashed_password": _PLACEHOLDER_PASSWORD_HASH,
+            }
+            for username in usernames
+        ],
+    ).all()
+    return list(users)
+
+
 def create_test_route_preference(
     db: Session,
     user_id: int,
@@ -40,11 +84,28 @@ def create_test_route_preference(
         to_longitude=to_lon,
     )
     db.add(preference)
-    db.commit()
-    db.refresh(preference)
+    db.flush()
     return preference
 
 
+def create_test_route_preferences(
+    db: Session,
+    user_id: int,
+    *specs: tuple[str, float, float, float, float],
+) -> list[RoutePreference]:
+    """
+    Helper function to create several route preferences with one flush.
+    Each spec is (prompt, from_lat, from_lon, to_lat, to_lon).
+    """
+    preferences = [
+        RoutePreference(user_id, prompt, from_lat, from_lon, to_lat, to_lon)
+        for prompt, from_lat, from_lon, to_lat, to_lon in specs
+    ]
+    db.add_all(preferences)
+    db.flush()
+    return preferences
+
+
 def test_get_user_preferences_empty(db: Session):
     """Test getting preferences when user has none"""
     user = create_test_user(db)
@@ -57,11 +118,11 @@ def test_get_user_preferences_empty(db: Session):
 def test_get_user_preferences(db: Session):
     """Test getting preferences for a user"""
     user = create_test_user(db)
-    pref1 = create_test_route_preference(
-        db, user.id, "Prefer direct routes", 60.1699, 24.9384, 60.2055, 24.6559
-    )
-    pref2 = create_test_route_preference(
-        db, user.id, "Avoid buses", 60.1699, 24.9384, 60.1951, 24.9402
+    pref1, pref2 = create_test_route_preferences(
+        db,
+        user.id,
+        ("Prefer direct routes", 60.1699, 24.9384, 60.2055, 24.6559),
+        ("Avoid buses", 60.1699, 24.9384, 60.1951, 24.9402),
     )
 
     preferences = route_preference_service.get_user_preferences(db, user.id)
@@ -99,16 +160,9 @@ def test_get_preference_by_id_not_found(db: Session):
 def test_create_preference(db: Session):
     """Test creating a new preference"""
     user = create_test_user(db)
-    preference_in = RoutePreferenceCreate(
-        prompt="Prefer trains over buses",
-        from_latitude=60.1699,
-        from_longitude=24.9384,
-        to_latitude=60.2055,
-        to_longitude=24.6559,
-    )
 
     preference = route_preference_service.create_preference(
-        db, user.id, preference_in
+        db, user.id, _TRAINS_PREF
     )
 
     assert preference.id is not None
@@ -124,16 +178,9 @@ def test_create_preference(db: Session):
 def test_create_preference_strips_whitespace(db: Session):
     """Test that creating a preference strips leading/trailing whitespace"""
     user = create_test_user(db)
-    preference_in = RoutePreferenceCreate(
-        prompt="  Avoid crowded routes  ",
-        from_latitude=60.1699,
-        from_longitude=24.9384,
-        to_latitude=60.2055,
-        to_longitude=24.6559,
-    )
 
     preference = route_preference_service.create_preference(
-        db, user.id, preference_in
+        db, user.id, _PADDED_PREF
     )
 
     assert preference.prompt == "Avoid crowded routes"
@@ -142,16 +189,9 @@ def test_create_preference_strips_whitespace(db: Session):
 def test_create_preference_empty_prompt(db: Session):
     """Test creating a preference with empty prompt raises error"""
     user = create_test_user(db)
-    preference_in = RoutePreferenceCreate(
-        prompt="",
-        from_latitude=60.1699,
-        from_longitude=24.9384,
-        to_latitude=60.2055,
-        to_longitude=24.6559,
-    )
 
     with pytest.raises(HTTPException) as exc_info:
-        route_preference_service.create_preference(db, user.id, preference_in)
+        route_preference_service.create_preference(db, user.id, _EMPTY_PREF)
 
     assert exc_info.value.status_code == 400
     assert "cannot be empty" in exc_info.value.detail
@@ -160,16 +200,11 @@ def test_create_preference_empty_prompt(db: Session):
 def test_create_preference_whitespace_only_prompt(db: Session):
     """Test creating a preference with whitespace-only prompt raises error"""
     user = create_test_user(db)
-    preference_in = RoutePreferenceCreate(
-        prompt="   ",
-        from_latitude=60.1699,
-        from_longitude=24.9384,
-        to_latitude=60.2055,
-        to_longitude=24.6559,
-    )
 
     with pytest.raises(HTTPException) as exc_info:
-        route_preference_service.create_preference(db, user.id, preference_in)
+        route_preference_service.create_preference(
+            db, user.id, _WHITESPACE_PREF
+        )
 
     assert exc_info.value.status_code == 400
     assert "cannot be empty" in exc_info.value.detail
@@ -201,14 +236,7 @@ def test_delete_preference_not_found(db: Session):
 
 def test_delete_preference_wrong_user(db: Session):
     """Test deleting another user's preference raises error"""
-    user1 = create_test_user(db)
-    user2 = User(
-        username="otheruser",
-        hashed_password=auth_service.get_password_hash("password"),
-    )
-    db.add(user2)
-    db.commit()
-    db.refresh(user2)
+    user1, user2 = create_test_users(db, "testuser", "otheruser")
 
     pref = create_test_route_preference(db, user1.id, "User1's preference")
 
@@ -222,16 +250,8 @@ def test_delete_preference_wrong_user(db: Session):
 def test_create_preference_with_edge_coordinates(db: Session):
     """Test creating a preference with edge case valid coordinates"""
     user = create_test_user(db)
-    preference_in = RoutePreferenceCreate(
-        prompt="Edge case test",
-        from_latitude=-90.0,
-        from_longitude=-180.0,
-        to_latitude=90.0,
-        to_longitude=180.0,
-    )
-
     preference = route_preference_service.create_preference(
-        db, user.id, preference_in
+        db, user.id, _EDGE_COORDS_PREF
     )
 
     assert preference.from_latitude == -90.0
@@ -242,18 +262,15 @@ def test_create_preference_with_edge_coordinates(db: Session):
 
 def test_multiple_users_preferences_isolated(db: Session):
     """Test that users can only see their own preferences"""
-    user1 = create_test_user(db)
-    user2 = User(
-        username="otheruser",
-        hashed_password=auth_service.get_password_hash("password"),
-    )
-    db.add(user2)
-    db.commit()
-    db.refresh(user2)
+    user1, user2 = create_test_users(db, "testuser", "otheruser")
 
     # Create preferences for both users
-    create_test_route_preference(db, user1.id, "User1 preference 1")
-    create_test_route_preference(db, user1.id, "User1 preference 2")
+    create_test_route_preferences(
+        db,
+        user1.id,
+        ("User1 preference 1", 60.1699, 24.9384, 60.2055, 24.6559),
+        ("User1 preference 2", 60.1699, 24.9384, 60.2055, 24.6559),
+    )
     create_test_route_preference(db, user2.id, "User2 preference 1")
 
     # User1 should only see their preferences
@@ -267,43 +284,64 @@ def test_multiple_users_preferences_isolated(db: Session):
     assert all(pref.user_id == user2.id for pref in user2_prefs)
 
 
-def test_get_preferences_by_coordinates_matching(db: Session):
-    """Test getting preferences by matching coordinates"""
+@pytest.mark.parametrize(
+    ("query", "expected_prompts"),
+    [
+        ((60.1699, 24.9384, 60.2055, 24.6559), ["Prefer scenic route"]),
+        ((60.1700, 24.9400, 60.2060, 24.6600), ["Different route"]),
+        ((60.1750, 24.9450, 60.2100, 24.6650), []),
+        ((60.1699, 24.9384, 60.9999, 24.9999), []),
+        ((60.9999, 24.9999, 60.2055, 24.6559), []),
+        # Rounding error far below the stored 1e-7 degree precision
+        (
+            (60.1699 + 1e-12, 24.9384, 60.2055, 24.6559 - 1e-12),
+            ["Prefer scenic route"],
+        ),
+    ],
+    ids=[
+        "match",
+        "other_route",
+        "no_match",
+        "origin_only",
+        "destination_only",
+        "float_noise",
+    ],
+)
+def test_get_preferences_by_coordinates(db: Session, query, expected_prompts):
+    """Test that coordinate search only returns exact coordinate matches"""
     user = create_test_user(db)
-
-    # Create preferences with different coordinates
-    pref1 = create_test_route_preference(
-        db, user.id, "Prefer scenic route", 60.1699, 24.9384, 60.2055, 24.6559
-    )
-    create_test_route_preference(
-        db, user.id, "Different route", 60.1700, 24.9400, 60.2060, 24.6600
+    create_test_route_preferences(
+        db,
+        user.id,
+        ("Prefer scenic route", 60.1699, 24.9384, 60.2055, 24.6559),
+        ("Different route", 60.1700, 24.9400, 60.2060, 24.6600),
     )
 
-    # Search for preferences matching specific coordinates
     matching_prefs = route_preference_service.get_preferences_by_coordinates(
-        db, user.id, 60.1699, 24.9384, 60.2055, 24.6559
+        db, user.id, *query
     )
 
-    assert len(matching_prefs) == 1
-    assert matching_prefs[0].id == pref1.id
-    assert matching_prefs[0].prompt == "Prefer scenic route"
+    assert [pref.prompt for pref in matching_prefs] == expected_prompts
 
 
-def test_get_preferences_by_coordinates_no_match(db: Session):
-    """Test getting preferences when coordinates don't match"""
+def test_get_preferences_by_coordinates_after_update(db: Session):
+    """Test that coordinate search follows coordinates changed in place"""
     user = create_test_user(db)
+    pref = create_test_route_preference(db, user.id, "Prefer scenic route")
 
-    # Create preference with specific coordinates
-    create_test_route_preference(
-        db, user.id, "Prefer scenic route", 60.1699, 24.9384, 60.2055, 24.6559
-    )
+    pref.to_latitude = 60.1951
+    pref.to_longitude = 24.9402
+    db.flush()
 
-    # Search with different coordinates
-    matching_prefs = route_preference_service.get_preferences_by_coordinates(
-        db, user.id, 60.1700, 24.9400, 60.2060, 24.6600
+    moved_prefs = route_preference_service.get_preferences_by_coordinates(
+        db, user.id, 60.1699, 24.9384, 60.1951, 24.9402
+    )
+    old_prefs = route_preference_service.get_preferences_by_coordinates(
+        db, user.id, **_DEFAULT_COORDS
     )
 
-    assert len(matching_prefs) == 0
+    assert [p.id for p in moved_prefs] == [pref.id]
+    assert old_prefs == []
 
 
 def test_get_preferences_by_coordinates_multiple_matches(db: Session):
@@ -311,16 +349,16 @@ def test_get_preferences_by_coordinates_multiple_matches(db: Session):
     user = create_test_user(db)
 
     # Create multiple preferences with same coordinates
-    pref1 = create_test_route_preference(
-        db, user.id, "Prefer scenic route", 60.1699, 24.9384, 60.2055, 24.6559
-    )
-    pref2 = create_test_route_preference(
-        db, user.id, "Avoid construction", 60.1699, 24.9384, 60.2055, 24.6559
+    pref1, pref2 = create_test_route_preferences(
+        db,
+        user.id,
+        ("Prefer scenic route", 60.1699, 24.9384, 60.2055, 24.6559),
+        ("Avoid construction", 60.1699, 24.9384, 60.2055, 24.6559),
     )
 
     # Search for preferences matching coordinates
     matching_prefs = route_preference_service.get_preferences_by_coordinates(
-        db, user.id, 60.1699, 24.9384, 60.2055, 24.6559
+        db, user.id, **_DEFAULT_COORDS
     )
 
     assert len(matching_prefs) == 2
@@ -330,14 +368,7 @@ def test_get_preferences_by_coordinates_multiple_matches(db: Session):
 
 def test_get_preferences_by_coordinates_user_isolation(db: Session):
     """Test that coordinate search is isolated per user"""
-    user1 = create_test_user(db)
-    user2 = User(
-        username="otheruser",
-        hashed_password=auth_service.get_password_hash("password"),
-    )
-    db.add(user2)
-    db.commit()
-    db.refresh(user2)
+    user1, user2 = create_test_users(db, "testuser", "otheruser")
 
     # Create preferences for both users with same coordinates
     create_test_route_preference(
@@ -349,36 +380,42 @@ def test_get_preferences_by_coordinates_user_isolation(db: Session):
 
     # User1 should only see their preference
     user1_prefs = route_preference_service.get_preferences_by_coordinates(
-        db, user1.id, 60.1699, 24.9384, 60.2055, 24.6559
+        db, user1.id, **_DEFAULT_COORDS
     )
     assert len(user1_prefs) == 1
     assert user1_prefs[0].prompt == "User1 preference"
 
     # User2 should only see their preference
     user2_prefs = route_preference_service.get_preferences_by_coordinates(
-        db, user2.id, 60.1699, 24.9384, 60.2055, 24.6559
+        db, user2.id, **_DEFAULT_COORDS
     )
     assert len(user2_prefs) == 1
     assert user2_prefs[0].prompt == "User2 preference"
 
 
-def test_get_preferences_by_coordinates_partial_match(db: Session):
-    """Test that partial coordinate matches don't return results"""
+def test_get_preferences_by_coordinates_uses_index(db: Session):
+    """Test that coordinate search is an index seek, not a table scan"""
     user = create_test_user(db)
-
-    # Create preference with specific coordinates
-    create_test_route_preference(
-        db, user.id, "Prefer scenic route", 60.1699, 24.9384, 60.2055, 24.6559
-    )
-
-    # Try matching with only origin coordinates correct
-    matching_prefs = route_preference_service.get_preferences_by_coordinates(
-        db, user.id, 60.1699, 24.9384, 60.9999, 24.9999
-    )
-    assert len(matching_prefs) == 0
-
-    # Try matching with only destination coordinates correct
-    matching_prefs = route_preference_service.get_preferences_by_coordinates(
-        db, user.id, 60.9999, 24.9999, 60.2055, 24.6559
+    connection = db.connection()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", record)
+    try:
+        route_preference_service.get_preferences_by_coordinates(
+            db, user.id, **_DEFAULT_COORDS
+        )
+    finally:
+        event.remove(connection, "before_cursor_execute", record)
+
+    statement, parameters = statements[-1]
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {statement}", parameters
+    ).fetchall()
+
+    assert any(
+        "USING INDEX ix_route_preferences_user_coords" in row.detail
+        for row in plan
     )
-    assert len(matching_prefs) == 0
@@ -3,22 +3,45 @@ Unit tests for routing service.
 """
 
 from datetime import datetime, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from app.schemas.geo import Coordinates
 from app.schemas.itinary import Itinerary, Leg, Route, TransportMode
-from app.services.routing_service import RoutingService
+from app.services.routing_service import ITINERARY_DOCUMENT, RoutingService
 
 
-@pytest.fixture
+class _FakeGqlClient:
+    """Records queries and answers them with a canned response"""
+
+    def __init__(self, response=None):
+        self.response = response
+        self.calls = []
+        self.closed = False
+
+    async def execute_async(self, document, **kwargs):
+        self.calls.append((document, kwargs))
+        return self.response
+
+    async def close_async(self):
+        self.closed = True
+
+
+@pytest.fixture(scope="module")
 def routing_service():
     """Create a routing service instance for testing."""
     return RoutingService()
 
 
 @pytest.fixture
+def gql_client(routing_service, monkeypatch):
+    """Route the service through a fake GraphQL client."""
+    client = _FakeGqlClient()
+    monkeypatch.setattr(routing_service, "_get_client", lambda: client)
+    return client
+
+
+@pytest.fixture(scope="module")
 def sample_coordinates():
     """Sample coordinates for testing."""
     return {
@@ -29,7 +52,13 @@ def sample_coordinates():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def empty_graphql_response():
+    """GraphQL API response with no itineraries."""
+    return {"planConnection": {"edges": []}}
+
+
+@pytest.fixture(scope="module")
 def sample_graphql_response():
     """Sample GraphQL API response."""
     return {
@@ -99,60 +128,63 @@ def sample_graphql_response():
     }
 
 
+@pytest.mark.parametrize(
+    ("response_fixture", "expected"),
+    [
+        ("sample_graphql_response", [(2700, 500.0, 2)]),
+        ("empty_graphql_response", []),
+    ],
+    ids=["success", "empty_response"],
+)
 @pytest.mark.asyncio
-async def test_get_itinaries_success(
-    routing_service, sample_coordinates, sample_graphql_response
+async def test_get_itinaries(
+    request,
+    routing_service,
+    gql_client,
+    sample_coordinates,
+    response_fixture,
+    expected,
 ):
-    """Test successful itinerary fetch."""
-    with patch.object(routing_service, "_get_client") as mock_client:
-        mock_gql_client = MagicMock()
-        mock_gql_client.execute_async = AsyncMock(
-            return_value=sample_graphql_response
-        )
-        mock_client.return_value = mock_gql_client
-
-        itineraries = await routing_service.get_itinaries(
-            origin=sample_coordinates["origin"],
-            destination=sample_coordinates["destination"],
-        )
-
-        assert len(itineraries) == 1
-        assert isinstance(itineraries[0], Itinerary)
-        assert itineraries[0].duration == 2700
-        assert itineraries[0].walk_distance == 500.0
-        assert len(itineraries[0].legs) == 2
+    """Test itinerary fetch for populated and empty API responses."""
+    gql_client.response = request.getfixturevalue(response_fixture)
+
+    itineraries = await routing_service.get_itinaries(
+        origin=sample_coordinates["origin"],
+        destination=sample_coordinates["destination"],
+    )
+
+    assert all(isinstance(itinerary, Itinerary) for itinerary in itineraries)
+    assert [
+        (itinerary.duration, itinerary.walk_distance, len(itinerary.legs))
+        for itinerary in itineraries
+    ] == expected
 
 
 @pytest.mark.asyncio
 async def test_get_itinaries_with_custom_params(
-    routing_service, sample_coordinates
+    routing_service, gql_client, sample_coordinates, empty_graphql_response
 ):
     """Test itinerary fetch with custom parameters."""
     departure_time = datetime(2025, 10, 14, 12, 0, 0, tzinfo=timezone.utc)
+    gql_client.response = empty_graphql_response
 
-    with patch.object(routing_service, "_get_client") as mock_client:
-        mock_gql_client = MagicMock()
-        mock_gql_client.execute_async = AsyncMock(
-            return_value={"planConnection": {"edges": []}}
-        )
-        mock_client.return_value = mock_gql_client
+    await routing_service.get_itinaries(
+        origin=sample_coordinates["origin"],
+        destination=sample_coordinates["destination"],
+        earliest_departure=departure_time,
+        first=5,
+    )
 
-        await routing_service.get_itinaries(
-            origin=sample_coordinates["origin"],
-            destination=sample_coordinates["destination"],
-            earliest_departure=departure_time,
-            first=5,
-        )
+    document, kwargs = gql_client.calls[-1]
+    variables = kwargs["variable_values"]
 
-        call_args = mock_gql_client.execute_async.call_args
-        variables = call_args[1]["variable_values"]
-
-        assert variables["first"] == 5
-        assert variables["originLat"] == sample_coordinates["origin"].latitude
-        assert (
-            variables["destinationLat"]
-            == sample_coordinates["destination"].latitude
-        )
+    assert document is ITINERARY_DOCUMENT
+    assert variables["first"] == 5
+    assert variables["originLat"] == sample_coordinates["origin"].latitude
+    assert (
+        variables["destinationLat"]
+        == sample_coordinates["destination"].latitude
+    )
 
 
 def test_parse_itinary(routing_service, sample_graphql_response):
@@ -233,33 +265,13 @@ def test_parse_route(routing_service):
 
 
 @pytest.mark.asyncio
-async def test_get_itinaries_empty_response(
-    routing_service, sample_coordinates
-):
-    """Test handling of empty API response."""
-    with patch.object(routing_service, "_get_client") as mock_client:
-        mock_gql_client = MagicMock()
-        mock_gql_client.execute_async = AsyncMock(
-            return_value={"planConnection": {"edges": []}}
-        )
-        mock_client.return_value = mock_gql_client
-
-        itineraries = await routing_service.get_itinaries(
-            origin=sample_coordinates["origin"],
-            destination=sample_coordinates["destination"],
-        )
-
-        assert len(itineraries) == 0
-
-
-@pytest.mark.asyncio
-async def test_close_client(routing_service):
+async def test_close_client(routing_service, monkeypatch):
     """Test closing the GraphQL client."""
-    mock_client = MagicMock()
-    mock_client.close_async = AsyncMock()
-    routing_service._client = mock_client
+    client = _FakeGqlClient()
+    # The service is shared by the module; restore its client afterwards
+    monkeypatch.setattr(routing_service, "_client", client)
 
     await routing_service.close()
 
-    mock_client.close_async.assert_called_once()
+    assert client.closed
     assert routing_service._client is None